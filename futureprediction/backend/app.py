@@ -4,15 +4,56 @@ from pydantic import BaseModel, Field
 from fastapi.middleware.cors import CORSMiddleware
 from typing import Optional
 from datetime import datetime
+from collections import namedtuple
+from dataclasses import dataclass, replace
+from functools import lru_cache
 import random
+import math
 import csv
 import os
-import statistics
+import sys
+import time
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # optional: without numba the walk runs as plain Python
+    njit = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: without pyarrow only the CSV is read
+    pq = None
 
 # ---------- Config ----------
 HOST = "0.0.0.0"
 PORT = 5000
-MOCK_CSV = "mock_prices.csv"  # optional CSV file you can provide (see generator below)
+MOCK_CSV = "mock_prices.csv"  # optional CSV file you can provide (see generate_mock_prices.py)
+MOCK_PARQUET = "mock_prices.parquet"  # read instead of MOCK_CSV if at least as new and pyarrow is installed
+
+# monthly price volatility by crop (rough categories); unknown crops use DEFAULT_VOL
+DEFAULT_VOL = 0.05
+CROP_VOL = {
+    # low
+    "rice": 0.02, "wheat": 0.02, "maize": 0.02, "paddy": 0.02,
+    # medium
+    "potato": 0.06, "capsicum": 0.06, "brinjal": 0.06,
+    # high: tomato/onion swing the most, so they sit here rather than in medium
+    "tomato": 0.12, "onion": 0.12,
+}
+
+# without numba, horizons at least this long draw the whole random walk in one
+# NumPy call; with numba the compiled loop is faster for any realistic horizon
+VECTOR_WALK_MIN_MONTHS = 8
+_rng = np.random.default_rng()
+
+# synthetic base price (per kg) used when there is no mock record for a crop
+BASE_PRICE = {
+    "tomato": 18.0, "onion": 22.0, "potato": 15.0,
+    "rice": 30.0, "wheat": 25.0, "maize": 20.0,
+    "banana": 30.0, "mango": 50.0
+}
 
 # ---------- FastAPI setup ----------
 app = FastAPI(title="FutureCrop - Price Prediction API")
@@ -46,38 +87,198 @@ class PredictResponse(BaseModel):
     method: str
 
 # ---------- Mock data loader ----------
+# One mock price record. state/district/market/crop are lowercased and interned,
+# so equal labels are the same object.
+@dataclass(slots=True, frozen=True)
+class Row:
+    state: str
+    district: str
+    market: str
+    crop: str
+    date: str
+    price: float
+    unit: str
+
+# Column-wise view of MOCK_DATA used for filtering. The categorical columns are
+# integer-coded (lowercased label -> code in the *_map dicts) so a filter is a
+# vectorized int comparison instead of a per-row string compare.
+MockSoA = namedtuple("MockSoA", [
+    "state_codes", "district_codes", "market_codes", "crop_codes", "date_ord", "prices",
+    "state_map", "district_map", "market_map", "crop_map",
+])
+
+def _lc(value):
+    return sys.intern(value.strip().lower())
+
+def _date_ordinal(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").toordinal()
+    except:
+        return -1
+
+def _encode(labels):
+    mapping = {}
+    codes = np.array([mapping.setdefault(label, len(mapping)) for label in labels], dtype=np.int32)
+    return codes, mapping
+
+def build_mock_soa(data):
+    state_codes, state_map = _encode([r.state for r in data])
+    district_codes, district_map = _encode([r.district for r in data])
+    market_codes, market_map = _encode([r.market for r in data])
+    crop_codes, crop_map = _encode([r.crop for r in data])
+    return MockSoA(
+        state_codes=state_codes,
+        district_codes=district_codes,
+        market_codes=market_codes,
+        crop_codes=crop_codes,
+        date_ord=np.array([_date_ordinal(r.date) for r in data], dtype=np.int32),
+        prices=np.array([r.price for r in data], dtype=np.float64),
+        state_map=state_map,
+        district_map=district_map,
+        market_map=market_map,
+        crop_map=crop_map,
+    )
+
 # Expected CSV format (optional): state,district,market,crop,date,price,unit
-def load_mock_data(csv_path=MOCK_CSV):
+MOCK_COLUMNS = ("state", "district", "market", "crop", "date", "price", "unit")
+
+def _dictionary_labels(column):
+    # lowercase/intern each distinct value once, then expand by dictionary index
+    column = column.combine_chunks()
+    if pa.types.is_null(column.type):
+        return [""] * len(column)  # e.g. an all-None column written by pandas
+    if not pa.types.is_dictionary(column.type):
+        return [_lc(str(v)) if v is not None else "" for v in column.to_pylist()]
+    labels = [_lc(v or "") for v in column.dictionary.to_pylist()]
+    return [labels[i] if i is not None else "" for i in column.indices.to_pylist()]
+
+def load_mock_parquet(parquet_path):
+    """
+    Reads the Parquet copy of the mock data into Rows, like load_mock_csv.
+    Prices are already typed, and the categorical columns come back
+    dictionary-encoded so each distinct label is normalised once.
+    """
+    # like the CSV loader, every column is optional: absent ones read as blank
+    # (unit as "kg")
+    present = set(pq.read_schema(parquet_path).names)
+    columns = [name for name in MOCK_COLUMNS if name in present]
+    categorical = ("state", "district", "market", "crop")
+    table = pq.read_table(parquet_path, columns=columns, read_dictionary=[c for c in categorical if c in present])
+    table = table.unify_dictionaries()
+    blank = [None] * table.num_rows
+
+    def values(name):
+        return table.column(name).to_pylist() if name in present else blank
+
+    states, districts, markets, crops = (
+        _dictionary_labels(table.column(name)) if name in present else [""] * table.num_rows
+        for name in categorical
+    )
+    # str() covers both string and date32 columns (date32 gives datetime.date)
+    dates = [str(d).strip() if d is not None else "" for d in values("date")]
+    prices = [p or 0.0 for p in values("price")]
+    units = [sys.intern((u or "").strip() or "kg") for u in values("unit")]
+    return [Row(*fields) for fields in zip(states, districts, markets, crops, dates, prices, units)]
+
+def load_mock_csv(csv_path):
     data = []
     if not os.path.exists(csv_path):
         return data
     with open(csv_path, newline='', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header:
+            return data
+        # every column is optional, as with the old DictReader loader: absent
+        # ones read as blank (unit as "kg", price as 0)
+        i_state, i_district, i_market, i_crop, i_date, i_price, i_unit = (
+            header.index(name) if name in header else None for name in MOCK_COLUMNS
+        )
         for row in reader:
+            if not row:
+                continue
             try:
-                row_price = float(row.get("price") or 0)
+                row_price = float(row[i_price] or 0) if i_price is not None else 0.0
             except:
                 row_price = 0.0
-            data.append({
-                "state": row.get("state", "").strip(),
-                "district": row.get("district", "").strip(),
-                "market": row.get("market", "").strip(),
-                "crop": row.get("crop", "").strip(),
-                "date": row.get("date", "").strip(),
-                "price": row_price,
-                "unit": row.get("unit", "kg").strip() or "kg"
-            })
+            data.append(Row(
+                _lc(row[i_state]) if i_state is not None else "",
+                _lc(row[i_district]) if i_district is not None else "",
+                _lc(row[i_market]) if i_market is not None else "",
+                _lc(row[i_crop]) if i_crop is not None else "",
+                row[i_date].strip() if i_date is not None else "",
+                row_price,
+                sys.intern((row[i_unit].strip() if i_unit is not None else "") or "kg"),
+            ))
     return data
 
-MOCK_DATA = load_mock_data()
+def load_mock_data(csv_path=MOCK_CSV, parquet_path=MOCK_PARQUET):
+    """
+    Returns (rows, soa): a read-only tuple of Rows and their column-wise MockSoA.
+    """
+    # a CSV newer than the Parquet copy was edited or replaced, so it wins
+    use_parquet = pq is not None and os.path.exists(parquet_path) and (
+        not os.path.exists(csv_path) or os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path)
+    )
+    if use_parquet:
+        data = tuple(load_mock_parquet(parquet_path))
+    else:
+        data = tuple(load_mock_csv(csv_path))
+    return data, build_mock_soa(data)
+
+def build_mock_indexes(data, soa):
+    """
+    Groups rows into buckets keyed by lowercased labels:
+      - (crop, state, district, market), None standing for "any"
+      - (crop, state)
+      - crop
+    Returns (latest, median): per bucket key, the latest row index (CSV order
+    on ties) and the median of its positive prices, so requests never parse
+    dates or sort. The buckets themselves are dropped once these are built.
+    """
+    full, crop_state, crop = {}, {}, {}
+    for i, r in enumerate(data):
+        c, s, d, m = r.crop, r.state, r.district, r.market
+        for s_key in (s, None):
+            for d_key, m_key in ((d, m), (d, None), (None, m)):
+                full.setdefault((c, s_key, d_key, m_key), []).append(i)
+        crop_state.setdefault((c, s), []).append(i)
+        crop.setdefault(c, []).append(i)
+    latest, median = {}, {}
+    for index in (full, crop_state, crop):
+        for key, rows in index.items():
+            # rows are in CSV order and argmax returns the first maximum
+            latest[key] = rows[int(np.argmax(soa.date_ord[rows]))]
+            prices = soa.prices[rows]
+            prices = prices[prices > 0]
+            if prices.size:
+                median[key] = float(np.median(prices))
+    return latest, median
+
+MOCK_DATA, MOCK_SOA = load_mock_data()
+LATEST, MEDIAN = build_mock_indexes(MOCK_DATA, MOCK_SOA)
 
 # helpers
 def month_to_date(ym: str):
-    # ym like "2025-12"
-    try:
-        return datetime.strptime(ym + "-01", "%Y-%m-%d")
-    except:
+    # ym like "2025-12" -> (2025, 12); parsed by hand since strptime is slow
+    if len(ym) != 7 or ym[4] != "-" or not ym[:4].isdigit() or not ym[5:].isdigit():
+        raise ValueError("month must be YYYY-MM")
+    year, month = int(ym[:4]), int(ym[5:])
+    if not 1 <= month <= 12:
         raise ValueError("month must be YYYY-MM")
+    return year, month
+
+# (monotonic time of last refresh, (year, month)); predict only needs month
+# resolution, so datetime.now() is called at most every NOW_REFRESH_SECONDS
+NOW_REFRESH_SECONDS = 30
+_NOW_CACHE = [float("-inf"), (0, 0)]
+
+def _now_ym():
+    t = time.monotonic()
+    if t - _NOW_CACHE[0] > NOW_REFRESH_SECONDS:
+        now = datetime.now()
+        _NOW_CACHE[:] = [t, (now.year, now.month)]
+    return _NOW_CACHE[1]
 
 def find_recent_price(state, district, crop, market):
     """
@@ -85,125 +286,169 @@ def find_recent_price(state, district, crop, market):
     """
     if not MOCK_DATA:
         return None
-    # filter by crop and state (prefer exact district/market matches)
-    def matches(row):
-        if row["crop"].lower() != crop.lower():
-            return False
-        if state and row["state"].lower() != state.lower():
-            return False
-        # allow district/market to be optional
-        if district and row["district"]:
-            if row["district"].lower() != district.lower():
-                return False
-        if market and row["market"]:
-            if row["market"].lower() != (market.lower()):
-                return False
-        return True
-
-    candidates = [r for r in MOCK_DATA if matches(r)]
-    if not candidates:
+    # lowercase first so "Tomato" and "tomato" share a cache entry, and fold
+    # labels absent from the data into one key so clients can't grow the cache
+    soa = MOCK_SOA
+    return _find_record(
+        _known(state.lower(), soa.state_map),
+        _known(district.lower(), soa.district_map),
+        _known(crop.lower(), soa.crop_map),
+        _known(market.lower(), soa.market_map),
+    )
+
+# stands in for any non-blank label that doesn't occur in the mock data; like
+# such a label it matches no row (except blank district/market rows)
+_UNKNOWN = object()
+
+def _known(label, code_map):
+    return label if not label or label in code_map else _UNKNOWN
+
+@lru_cache(maxsize=4096)
+def _find_record(state_lc, district_lc, crop_lc, market_lc):
+    """
+    Memoized lookup behind find_recent_price; Rows are frozen so they are
+    safe to share. Call _find_record.cache_clear() if MOCK_DATA is reloaded.
+    """
+    soa = MOCK_SOA
+    keys = [k for k in _bucket_keys(state_lc, district_lc, crop_lc, market_lc) if k in LATEST]
+    if not keys:
         # relax filters: match only crop (global)
-        candidates = [r for r in MOCK_DATA if r["crop"].lower() == crop.lower()]
-    if not candidates:
-        return None
+        if crop_lc not in LATEST:
+            return None
+        keys = [crop_lc]
     # pick latest by date if date present, else median
-    with_dates = []
-    for r in candidates:
-        try:
-            d = datetime.strptime(r["date"], "%Y-%m-%d")
-            with_dates.append((d, r))
-        except:
-            continue
-    if with_dates:
-        with_dates.sort(key=lambda x: x[0], reverse=True)
-        return with_dates[0][1]  # most recent record
+    if len(keys) == 1:
+        latest = LATEST[keys[0]]
+        if soa.date_ord[latest] >= 0:
+            return MOCK_DATA[latest]  # most recent record
+        med = MEDIAN.get(keys[0])
+    else:
+        # rows with a blank district/market span several buckets; combine them with a mask
+        mask = _filter_mask(soa, state_lc, district_lc, crop_lc, market_lc)
+        dated = np.where(mask, soa.date_ord, -1)
+        latest = int(np.argmax(dated))  # first row wins on ties
+        if dated[latest] >= 0:
+            return MOCK_DATA[latest]  # most recent record
+        latest = int(np.argmax(mask))
+        prices = soa.prices[mask & (soa.prices > 0)]
+        med = float(np.median(prices)) if prices.size else None
     # else return median-priced record
-    prices = [r["price"] for r in candidates if r["price"] > 0]
-    if prices:
-        med = statistics.median(prices)
-        r = candidates[0].copy()
-        r["price"] = med
-        return r
+    if med is not None:
+        return replace(MOCK_DATA[latest], price=med)
     return None
 
+def _filter_mask(soa, state_lc, district_lc, crop_lc, market_lc):
+    """
+    Boolean mask over MOCK_DATA rows matching the filters; labels missing from
+    a code map get -1, which matches nothing. Blank district/market rows match any.
+    """
+    mask = soa.crop_codes == soa.crop_map.get(crop_lc, -1)
+    if state_lc:
+        mask &= soa.state_codes == soa.state_map.get(state_lc, -1)
+    if district_lc:
+        mask &= ((soa.district_codes == soa.district_map.get(district_lc, -1))
+                 | (soa.district_codes == soa.district_map.get("", -1)))
+    if market_lc:
+        mask &= ((soa.market_codes == soa.market_map.get(market_lc, -1))
+                 | (soa.market_codes == soa.market_map.get("", -1)))
+    return mask
+
+def _bucket_keys(state_lc, district_lc, crop_lc, market_lc):
+    """
+    Index keys whose buckets together hold the matching rows. Rows with a
+    blank district/market match any requested value, hence the "" keys.
+    """
+    if not district_lc and not market_lc:
+        return [(crop_lc, state_lc)] if state_lc else [crop_lc]
+    districts = (district_lc, "") if district_lc else (None,)
+    markets = (market_lc, "") if market_lc else (None,)
+    return [(crop_lc, state_lc or None, d, m) for d in districts for m in markets]
+
+def _r2(x):
+    # round a (non-negative) price to 2 decimals, half up, without round()
+    return int(x * 100 + 0.5) / 100.0
+
 # ---------- Simple placeholder prediction function ----------
+def _walk(price, months, vol):
+    gauss = random.gauss  # local name: skips the module attribute lookup per month
+    for _ in range(months):
+        # monthly percentage change drawn from normal with std=vol
+        price = max(0.01, price * (1.0 + gauss(0.0, vol)))
+    return price
+
+if njit is not None:
+    _walk = njit(cache=True, fastmath=True)(_walk)
+    _walk(10.0, 1, 0.05)  # compile now so the first request doesn't pay for it
+
 def simple_predict(current_price: float, months_ahead: int = 1, crop: str = ""):
     """
     Placeholder rule-based predictor. Replace with ML model later.
     Strategy:
       - add small seasonal/random delta based on crop categories
     """
-    # base volatility by crop (rough categories)
-    low_vol = {"rice", "wheat", "maize", "paddy"}
-    med_vol = {"onion", "tomato", "potato", "capsicum", "brinjal"}
-    high_vol = {"tomato", "onion"}  # more variable
-
     c = crop.lower()
-    vol = 0.05  # default 5% per month
-    if any(x in c for x in low_vol):
-        vol = 0.02
-    elif any(x in c for x in med_vol):
-        vol = 0.06
-    elif any(x in c for x in high_vol):
-        vol = 0.12
+    vol = CROP_VOL.get(c)
+    if vol is None:
+        # compound names like "cherry tomato" still match by substring
+        vol = next((v for name, v in CROP_VOL.items() if name in c), DEFAULT_VOL)
 
     # random walk over months_ahead
-    price = current_price
-    for _ in range(months_ahead):
-        # monthly percentage change drawn from normal with std=vol
-        change_pct = random.gauss(0, vol)
-        price = max(0.01, price * (1 + change_pct))
+    if njit is None and months_ahead >= VECTOR_WALK_MIN_MONTHS:
+        # compound all monthly changes at once; clipping keeps each factor > 0
+        deltas = _rng.standard_normal(months_ahead) * vol  # ziggurat sampler, in C
+        log_factors = np.log1p(np.clip(deltas, -0.99, None))
+        price = max(0.01, current_price * math.exp(log_factors.sum()))
+    else:
+        price = _walk(float(current_price), int(months_ahead), float(vol))
     # also add slight upward bias for demonstration
-    price = round(price * (1 + 0.01 * months_ahead), 2)
-    return price
+    price = price * (1 + 0.01 * months_ahead)
+    return price  # unrounded; predict rounds for the response
 
 # ---------- Endpoint ----------
+# plain def: the work is all blocking CPU, so FastAPI runs it in its threadpool
+# instead of holding up the event loop. Returning a plain dict lets FastAPI
+# serialize it straight to JSON through the PredictResponse model.
 @app.post("/predict", response_model=PredictResponse)
-async def predict(req: PredictRequest):
+def predict(req: PredictRequest):
     # Validate month
     try:
-        target_date = month_to_date(req.month)
+        target_year, target_month = month_to_date(req.month)
     except ValueError:
         raise HTTPException(status_code=400, detail="month must be in YYYY-MM format")
 
-    # months ahead relative to "now"
-    now = datetime.now()
-    months_ahead = (target_date.year - now.year) * 12 + (target_date.month - now.month)
-    if months_ahead < 0:
-        months_ahead = 0  # if user sends past month, predict current
+    # months ahead relative to "now"; if user sends past month, predict current
+    now_year, now_month = _now_ym()
+    months_ahead = max(0, (target_year - now_year) * 12 + (target_month - now_month))
 
     # Try to get current price from mock data
     record = find_recent_price(req.state, req.district or "", req.crop, req.market or "")
 
-    if record and record.get("price", 0) > 0:
-        current_price = float(record["price"])
-        unit = record.get("unit", "kg") or "kg"
+    if record and record.price > 0:
+        current_price = float(record.price)
+        unit = record.unit
         method = "mock-data"
     else:
         # fallback: synthetic base price by crop -> simple deterministic mapping
-        base_map = {
-            "tomato": 18.0, "onion": 22.0, "potato": 15.0,
-            "rice": 30.0, "wheat": 25.0, "maize": 20.0,
-            "banana": 30.0, "mango": 50.0
-        }
-        current_price = float(base_map.get(req.crop.lower(), random.uniform(10, 40)))
+        current_price = BASE_PRICE.get(req.crop.lower())
+        if current_price is None:
+            current_price = random.uniform(10, 40)
         unit = "kg"
         method = "synthetic"
 
     predicted_price = simple_predict(current_price, months_ahead=months_ahead, crop=req.crop)
 
     # Response
-    return PredictResponse(
-        state=req.state,
-        district=req.district,
-        market=req.market,
-        crop=req.crop,
-        month=req.month,
-        unit=unit,
-        currentPrice=round(current_price, 2),
-        predictedPrice=round(predicted_price, 2),
-        method=method
-    )
+    return {
+        "state": req.state,
+        "district": req.district,
+        "market": req.market,
+        "crop": req.crop,
+        "month": req.month,
+        "unit": unit,
+        "currentPrice": _r2(current_price),
+        "predictedPrice": _r2(predicted_price),
+        "method": method
+    }
 
 # ---------- Health / info ----------
 @app.get("/")
@@ -211,30 +456,6 @@ def root():
     return {"app": "FutureCrop Prediction API", "version": "0.1", "endpoints": ["/predict (POST)"]}
 
 # ---------- If run directly ----------
-if _name_ == "_main_":
+if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app:app", host="0.0.0.0", port=5000, reload=True)
-# generate_mock_csv.py
-import csv
-from random import choice, uniform, randint
-from datetime import datetime, timedelta
-
-states = ["Andhra Pradesh","Karnataka","Telangana","Maharashtra","Tamil Nadu"]
-districts = ["Visakhapatnam","Hyderabad","Bengaluru","Pune","Chennai"]
-markets = ["Main Market","Wholesale Yard","Central Mandai","Local Market"]
-crops = ["Tomato","Onion","Potato","Rice","Wheat"]
-
-with open("mock_prices.csv", "w", newline='', encoding='utf-8') as f:
-    writer = csv.writer(f)
-    writer.writerow(["state","district","market","crop","date","price","unit"])
-    for _ in range(1000):
-        state = choice(states)
-        district = choice(districts)
-        market = choice(markets)
-        crop = choice(crops)
-        days_ago = randint(0, 365)
-        dt = (datetime.now() - timedelta(days=days_ago)).strftime("%Y-%m-%d")
-        price = round(uniform(8.0, 60.0), 2)
-        unit = "kg"
-        writer.writerow([state, district, market, crop, dt, price, unit])
-print("mock_prices.csv generated")
\ No newline at end of file
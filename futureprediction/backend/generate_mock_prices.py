@@ -0,0 +1,42 @@
+import csv
+from datetime import date
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: the Parquet copy is only written when pyarrow is installed
+    pq = None
+
+states = ["Andhra Pradesh","Karnataka","Telangana","Maharashtra","Tamil Nadu"]
+districts = ["Visakhapatnam","Hyderabad","Bengaluru","Pune","Chennai"]
+markets = ["Main Market","Wholesale Yard","Central Mandai","Local Market"]
+crops = ["Tomato","Onion","Potato","Rice","Wheat"]
+
+n = 1000
+rng = np.random.default_rng()
+today = np.datetime64(date.today(), "D")
+
+# draw every column in one vectorized call instead of row by row
+days_ago = rng.integers(0, 366, n).astype("timedelta64[D]")
+columns = {
+    "state": np.array(states)[rng.integers(0, len(states), n)].tolist(),
+    "district": np.array(districts)[rng.integers(0, len(districts), n)].tolist(),
+    "market": np.array(markets)[rng.integers(0, len(markets), n)].tolist(),
+    "crop": np.array(crops)[rng.integers(0, len(crops), n)].tolist(),
+    "date": (today - days_ago).astype(str).tolist(),
+    "price": np.round(rng.uniform(8.0, 60.0, n), 2).tolist(),
+    "unit": ["kg"] * n,
+}
+
+with open("mock_prices.csv", "w", newline='', encoding='utf-8') as f:
+    writer = csv.writer(f)
+    writer.writerow(list(columns))
+    writer.writerows(zip(*columns.values()))
+print("mock_prices.csv generated")
+
+if pq is not None:
+    # columnar copy the API loads in preference to the CSV; the categorical
+    # columns are dictionary-encoded
+    pq.write_table(pa.table(columns), "mock_prices.parquet", use_dictionary=["state","district","market","crop"])
+    print("mock_prices.parquet generated")
\ No newline at end of file